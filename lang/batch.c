@@ -0,0 +1,13 @@
+#include <stdlib.h>
+
+{declarations}
+
+int main(int argc, char** argv) {{
+    if (argc != 2) {{
+        return 2;
+    }}
+    switch (atoi(argv[1])) {{
+{calls}
+    }}
+    return 2;
+}}
@@ -0,0 +1,13 @@
+#include <cstdlib>
+
+{declarations}
+
+int main(int argc, char** argv) {{
+    if (argc != 2) {{
+        return 2;
+    }}
+    switch (std::atoi(argv[1])) {{
+{calls}
+    }}
+    return 2;
+}}
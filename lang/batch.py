@@ -0,0 +1,21 @@
+import contextlib
+import io
+import json
+import sys
+import traceback
+
+# NOTE: Each line read is a JSON array of code snippets to run, and
+# the result of each is written as a JSON line, followed by `null`.
+for line in sys.stdin:
+    codes = json.loads(line)
+    for index, code in enumerate(codes):
+        output = io.StringIO()
+        try:
+            with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+                exec(compile(code, '<case>', 'exec'), {'__name__': '__main__'})
+            print(json.dumps([index, 0, output.getvalue()]))
+        except BaseException as error:
+            message = ''.join(traceback.format_exception_only(type(error), error))
+            print(json.dumps([index, 1, output.getvalue() + message]))
+    print(json.dumps(None))
+    sys.stdout.flush()
@@ -0,0 +1,30 @@
+require 'json'
+require 'stringio'
+
+# NOTE: Each line read is a JSON array of code snippets to run, and
+# the result of each is written as a JSON line, followed by `null`.
+def fresh_binding
+  return binding
+end
+
+stdout = $stdout
+$stdin.each_line do |line|
+  codes = JSON.parse(line)
+  codes.each_with_index do |code, index|
+    output = StringIO.new
+    $stdout = $stderr = output
+    begin
+      eval(code, fresh_binding, '-e')
+      status = 0
+    rescue Exception => error
+      output.puts "-e: #{error.message} (#{error.class})"
+      status = 1
+    ensure
+      $stdout = stdout
+      $stderr = STDERR
+    end
+    stdout.puts JSON.generate([index, status, output.string.scrub])
+  end
+  stdout.puts JSON.generate(nil)
+  stdout.flush
+end
@@ -0,0 +1,13 @@
+{modules}
+
+pub fn main() {{
+    let cases: &[fn()] = &[{calls}];
+    for (index, case) in cases.iter().enumerate() {{
+        println!("@@case-begin {{}}", index);
+        let status = match std::panic::catch_unwind(case) {{
+            Ok(_) => 0,
+            Err(_) => 101,
+        }};
+        println!("@@case-end {{}} {{}}", index, status);
+    }}
+}}
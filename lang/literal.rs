@@ -1,9 +1,8 @@
-pub fn main() {{
-    let x: {type} = {value};
-    let expected: {type} = {expected};
-    if expected != expected {{
-        assert_eq!(x != x, true);
-    }} else {{
-        assert_eq!(x, expected);
-    }}
-}}
+const ACTUAL: {type} = {value};
+const EXPECTED: {type} = {expected};
+const _: () = assert!(
+    if EXPECTED != EXPECTED {{ ACTUAL != ACTUAL }} else {{ ACTUAL == EXPECTED }},
+    "assertion `left == right` failed",
+);
+
+pub fn main() {{}}
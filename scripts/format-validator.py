@@ -18,51 +18,129 @@
     - `ruby`: `RUBY`
 
     Or these can be specified in a config file.
+
+    A compiler cache, such as `ccache` or `sccache`, can be
+    used for C and C++ by setting `CC_WRAPPER`.
 '''
 
 import typing
 import argparse
-import copy
+import functools
+import hashlib
+import io
 import itertools as it
+import json
+import logging
 import os
 import re
+import shlex
 import shutil
+import string
 import subprocess
+import sys
+import tempfile
+import threading
 import tomllib
 from collections.abc import Callable
-from dataclasses import dataclass
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
 from pathlib import Path
 
 __version__ = '0.0.1'
 __author__ = 'Alex Huszagh <ahuszagh@gmail.com>'
 
 home = Path(__file__).absolute().parent.parent
+# NOTE: This is replaced by a unique directory, ideally on a tmpfs, in main.
 temp = home / 'temp'
 lang = home / 'lang'
-verbose = False
+# verbose diagnostics for each command, enabled with `--verbose`
+log = logging.getLogger('format-validator')
+jobs = os.cpu_count() or 1
+# limits the number of subprocesses, since files and cases both run in parallel
+subprocesses = threading.BoundedSemaphore(jobs)
+counter = it.count()
+# the paths reused by each thread, by the directory and extension, since
+# each thread only builds one snippet at a time
+local = threading.local()
+# NOTE: Files run concurrently, so these hold futures, which lets a
+# result in progress in another thread be awaited rather than redone.
+# the interpreter versions, by the language name and resolved command
+versions: dict[tuple[str, tuple[str, ...]], Future[str]] = {}
+# the build results, by the language, command, langversion, literal, and code
+builds: dict[tuple[str, str | None, str | None, bool, str], Future[tuple['CompletedProcess', bool]]] = {}
+cache_lock = threading.Lock()
+# an optional directory to store the build results between runs
+cache: Path | None = None
+ansi_escape = re.compile(r'\x1b\[[0-9;]*m')
+# the version numbers reported by each interpreter or compiler
+rust_version = re.compile(r'^rustc (\d+\.\d+(?:\.\d+)?)')
+python_version = re.compile(r'^Python (\d+\.\d+(?:\.\d+)?)')
+ruby_version = re.compile(r'^ruby (\d+\.\d+(?:\.\d+)?)')
+go_version = re.compile(r'^.*?go(\d+\.\d+(?:\.\d+)?)')
+node_version = re.compile(r'^v(\d+\.\d+(?:\.\d+)?)')
+any_version = re.compile(r'^.*?(\d+\.\d+(?:\.\d+)?)')
+# the start and source location of rustc diagnostics
+rust_diagnostic = re.compile(r'^(?:error|warning)(?:\[\w+\])?:')
+rust_location = re.compile(r'--> <anon>:(\d+):\d+')
+# the source file of C and C++ diagnostics in a batch
+native_location = re.compile(r'\bcase_(\d+)\.\w+:')
+# long-lived interpreters, by the command, which run batches of snippets.
+# each has its own lock, so different interpreters run in parallel.
+workers: dict[tuple[str, ...], tuple[subprocess.Popen, threading.Lock]] = {}
+workers_lock = threading.Lock()
 
 CompletedProcess: typing.TypeAlias = subprocess.CompletedProcess[str]
 
 
-@dataclass
+@dataclass(slots=True)
 class Logger:
     '''Custom logger that also logs to an output file.'''
 
     output: os.PathLike | None
+    # the output file, kept open for all our messages
+    file: typing.TextIO | None = field(default=None, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        '''Open our output file, if provided.'''
+        if self.output is not None:
+            self.file = open(self.output, mode='a+', encoding='utf-8', buffering=65536)
 
     def log(self, message: str) -> None:
         '''Log our data to stdout, and optionally to file with no escape sequences.'''
 
-        print(message)
-        if self.output is None:
+        sys.stdout.write(f'{message}\n')
+        if self.file is None:
             return
 
-        with open(self.output, mode='a+', encoding='utf-8') as file:
-            no_ansi = re.sub(r'\x1b\[[0-9;]*m', '', message)
-            print(no_ansi, file=file)
+        no_ansi = ansi_escape.sub('', message) if '\x1b' in message else message
+        self.file.write(f'{no_ansi}\n')
+
+    def log_iter(self, messages: typing.Iterable[str]) -> None:
+        '''Log each message as it becomes available.'''
+        for message in messages:
+            self.log(message)
+
+    def flush(self) -> None:
+        '''Flush any buffered messages to stdout and the output file.'''
+        sys.stdout.flush()
+        if self.file is not None:
+            self.file.flush()
+
+    def close(self) -> None:
+        '''Close the output file, flushing any buffered messages.'''
+        sys.stdout.flush()
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def __enter__(self) -> 'Logger':
+        return self
+
+    def __exit__(self, *args: typing.Any) -> None:
+        self.close()
 
 
-@dataclass
+@dataclass(slots=True)
 class DataType:
     '''
     A single data type for testing.
@@ -90,7 +168,9 @@ class DataType:
             self.write = self.name
 
 
-@dataclass
+# NOTE: Languages are shared between files, so they are immutable.
+# Overrides use `dataclasses.replace`, and resolved commands are cached.
+@dataclass(frozen=True)
 class Language:
     '''Specification for a programming language or data interchange format.'''
 
@@ -105,6 +185,8 @@ class Language:
     langversion: str | None = None
     # Optional override for the command
     command: str | None = None
+    # Optional driver to run many snippets in a single process
+    batch: str | None = None
 
     def template(self, literal: bool) -> str:
         '''Get the template string for the test.'''
@@ -121,17 +203,147 @@ class Language:
             raise ValueError(f'Got an unsupported language of "{self.name}".')
         return build(code, literal)
 
+    def build_batch(self, codes: list[str], literal: bool) -> list[tuple[CompletedProcess, bool]]:
+        '''
+        Build many code snippets, returning the result for each.
+
+        Languages with a batch driver build and run all snippets in a
+        single process, otherwise, each snippet is built separately.
+        Identical snippets are only built once per run, and if a cache
+        directory is provided, only once per compiler version.
+        '''
+
+        key = (self.name, self.command, self.langversion, literal)
+        unique: list[str] = []
+        with cache_lock:
+            for code in codes:
+                if (*key, code) not in builds:
+                    builds[(*key, code)] = Future()
+                    unique.append(code)
+
+        # NOTE: Always finish our own builds before waiting on other threads.
+        futures = {code: builds[(*key, code)] for code in unique}
+        try:
+            if cache is not None and unique:
+                for code, result in self._load_cached(unique, literal).items():
+                    futures.pop(code).set_result(result)
+                unique = list(futures)
+            build_batch = getattr(self, f'_{self.name}_build_batch', None)
+            if build_batch is None or self.batch is None or not unique:
+                results = self.build_many(unique, literal)
+            else:
+                results = build_batch(unique, literal)
+            if cache is not None and unique:
+                self._store_cached(unique, literal, results)
+        except BaseException as error:
+            for future in futures.values():
+                future.set_exception(error)
+            raise
+        for future, result in zip(futures.values(), results):
+            future.set_result(result)
+
+        return [builds[(*key, code)].result() for code in codes]
+
+    def _cache_path(self, code: str, literal: bool) -> Path:
+        '''Get the path to the cached build result, which is unique to the compiler version.'''
+
+        assert cache is not None
+        # NOTE: Different tools can report the same version, so include the executable.
+        data = json.dumps([
+            self.name,
+            self.command,
+            self.langversion,
+            self.resolve_command(),
+            self.get_version(),
+            literal,
+            code,
+        ])
+        digest = hashlib.blake2b(data.encode('utf-8'), digest_size=16).hexdigest()
+        return cache / f'{digest}.json'
+
+    def _load_cached(self, codes: list[str], literal: bool) -> dict[str, tuple[CompletedProcess, bool]]:
+        '''Load any build results cached by previous runs.'''
+
+        results = {}
+        for code in codes:
+            try:
+                with self._cache_path(code, literal).open(encoding='utf-8') as file:
+                    args, returncode, stdout, not_equal = json.load(file)
+            except (OSError, ValueError):
+                continue
+            results[code] = (CompletedProcess(args, returncode, stdout), not_equal)
+        return results
+
+    def _store_cached(
+        self,
+        codes: list[str],
+        literal: bool,
+        results: list[tuple[CompletedProcess, bool]],
+    ) -> None:
+        '''Store the build results for later runs.'''
+
+        for code, (process, not_equal) in zip(codes, results):
+            # NOTE: Write to a temporary file first, so partial results are never read.
+            data = json.dumps([process.args, process.returncode, process.stdout, not_equal])
+            with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=cache, delete=False) as file:
+                file.write(data)
+            os.replace(file.name, self._cache_path(code, literal))
+
+    def build_many(self, codes: list[str], literal: bool) -> list[tuple[CompletedProcess, bool]]:
+        '''Build each code snippet separately, in parallel, returning the result for each.'''
+
+        # NOTE: The work is spent in subprocesses, so threads run in parallel.
+        if jobs == 1 or len(codes) <= 1:
+            return [self.build(code, literal) for code in codes]
+        with ThreadPoolExecutor(max_workers=min(jobs, len(codes))) as executor:
+            return list(executor.map(lambda code: self.build(code, literal), codes))
+
     def get_version(self) -> str:
         '''Get the current version of the used interpreter.'''
 
-        version = getattr(self, f'_{self.name}_version', None)
-        if version is None:
-            raise ValueError(f'Got an unsupported language of "{self.name}".')
-        return version
-
-    def create_path(self, directory: Path = temp) -> Path:
-        '''Create a new, unique path for testing.'''
-        return directory / f'testing{self.extension}'
+        # NOTE: Languages are copied for every override, so cache it globally.
+        # Different overrides often resolve to the same interpreter.
+        key = (self.name, self.resolve_command())
+        with cache_lock:
+            future = versions.get(key)
+            owner = future is None
+            if owner:
+                future = versions[key] = Future()
+
+        if owner:
+            try:
+                version = getattr(self, f'_{self.name}_version', None)
+                if version is None:
+                    raise ValueError(f'Got an unsupported language of "{self.name}".')
+                future.set_result(version)
+            except BaseException as error:
+                future.set_exception(error)
+                raise
+        return future.result()
+
+    def get_command(self) -> list[str] | None:
+        '''Get the resolved command to build or run the code, if there is one.'''
+
+        name = {'rust': 'rustc', 'c': 'cc', 'json': 'node'}.get(self.name, self.name)
+        return getattr(self, f'_{name}', None)
+
+    def resolve_command(self) -> tuple[str, ...]:
+        '''Get the command with the real path to the executable, which identifies the tool.'''
+
+        command = self.get_command() or ['']
+        return (os.path.realpath(which(command[0]) or command[0]), *command[1:])
+
+    def create_path(self, directory: Path | None = None) -> Path:
+        '''Create a path for testing, unique to the current thread.'''
+
+        # NOTE: This reuses the same files for every build on a thread,
+        # rather than creating new inodes for each snippet.
+        directory = temp if directory is None else directory
+        paths = local.__dict__.setdefault('paths', {})
+        key = (directory, self.extension)
+        if key not in paths:
+            paths[key] = directory / f'testing{next(counter)}{self.extension}'
+        return paths[key]
 
     def write_code(self, code: str) -> Path:
         '''Write our test code to a file for testing.'''
@@ -145,7 +357,7 @@ class Language:
 
     @staticmethod
     def _split(value: str) -> list[str]:
-        return value.strip().split()
+        return shlex.split(value)
 
     def _get_or_fallbacks(
         self,
@@ -166,41 +378,110 @@ class Language:
 
         if fallbacks is not None:
             for fallback in fallbacks:
-                if shutil.which(fallback) is not None:
+                if which(fallback) is not None:
                     return [fallback]
 
         return default
 
     @staticmethod
     def _getoutput(cmd: list[str]) -> str:
-        if verbose:
-            print('Command: ' + ' '.join(cmd))
-        result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, encoding='utf-8')
-        if verbose:
-            print('Output: ' + result.stdout)
-        return result.stdout
+        log.debug('Command: %s', ' '.join(cmd))
+        with subprocesses:
+            result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+        stdout = result.stdout.decode('utf-8', errors='replace')
+        log.debug('Output: %s', stdout)
+        return stdout
 
     @staticmethod
-    def _run(cmd: list[str]) -> CompletedProcess:
-        if verbose:
-            print('Running: ' + ' '.join(cmd))
-        result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, encoding='utf-8')
+    def _run(
+        cmd: list[str],
+        input: str | None = None,
+        cwd: Path | None = None,
+        capture: bool = True,
+    ) -> CompletedProcess:
+        verbose = log.isEnabledFor(logging.DEBUG)
         if verbose:
-            print('Received: ' + result.stdout)
-        return result
+            log.debug('Running: %s', ' '.join(cmd))
+        # NOTE: Capture bytes and decode once, skipping text-mode wrappers.
+        # Compilers may emit invalid UTF-8, so this must not raise. When
+        # only the status is needed, the output is discarded unless verbose.
+        stdout = subprocess.PIPE if capture or verbose else subprocess.DEVNULL
+        with subprocesses:
+            result = subprocess.run(
+                cmd,
+                input=input.encode('utf-8') if input is not None else None,
+                stdout=stdout,
+                stderr=subprocess.STDOUT,
+                cwd=cwd,
+            )
+        stdout = result.stdout.decode('utf-8', errors='replace') if result.stdout else ''
+        log.debug('Received: %s', stdout)
+        return CompletedProcess(result.args, result.returncode, stdout)
+
+    def _run_many(self, cmds: list[list[str]], cwd: Path | None = None) -> list[CompletedProcess]:
+        '''Run many commands, in parallel, returning the result for each.'''
+
+        if jobs == 1 or len(cmds) <= 1:
+            return [self._run(cmd, cwd=cwd) for cmd in cmds]
+        with ThreadPoolExecutor(max_workers=min(jobs, len(cmds))) as executor:
+            return list(executor.map(lambda cmd: self._run(cmd, cwd=cwd), cmds))
+
+    def _run_worker(self, cmd: list[str], codes: list[str]) -> list[CompletedProcess]:
+        '''
+        Run many code snippets in a long-lived interpreter, returning the result for each.
+
+        The worker reads a JSON array of snippets per line, and writes the
+        index, status, and output of each as a JSON line, followed by `null`.
+        '''
+
+        # NOTE: The worker is shared by all files using the same interpreter,
+        # so interpreter startup is only paid once. The global lock is only
+        # held to find or start the worker, so other interpreters aren't blocked.
+        key = tuple(cmd)
+        with workers_lock:
+            worker, lock = workers.get(key, (None, None))
+            if worker is None or worker.poll() is not None:
+                worker = subprocess.Popen(
+                    cmd,
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.STDOUT,
+                    encoding='utf-8',
+                    errors='replace',
+                )
+                lock = threading.Lock()
+                workers[key] = (worker, lock)
+
+        with lock:
+            log.debug('Running: %s cases with %s', len(codes), ' '.join(cmd[:-1]))
+            worker.stdin.write(json.dumps(codes) + '\n')
+            worker.stdin.flush()
+            lines = []
+            while (line := worker.stdout.readline()).strip() != 'null':
+                if not line:
+                    raise RuntimeError(f'The {self.name} worker for {cmd[0]} exited unexpectedly.')
+                lines.append(line)
+
+        processes = []
+        for line in lines:
+            _, returncode, stdout = json.loads(line)
+            processes.append(CompletedProcess(worker.args, returncode, stdout))
+        return processes
 
     def _build_and_test(
         self,
         code: str,
         literal: bool,
         cmd: Callable[[Path, Path], list[str]],
+        stdin: bool = False,
     ) -> CompletedProcess:
         '''Compile and optionally run the compiled code.'''
 
-        path = self.write_code(code)
-        output = path.parent / path.stem
+        # compilers which read from stdin don't need the code written to disk
+        path = self.create_path() if stdin else self.write_code(code)
+        output = path.with_suffix('')
         args = cmd(path, output)
-        result = self._run(args)
+        result = self._run(args, input=code if stdin else None)
 
         # compile-time failure is a test itself for literals
         if result.returncode != 0:
@@ -210,7 +491,7 @@ class Language:
             return result
 
         # if we have a mismatched value for our literals, then we have an issue
-        result = self._run([str(output)])
+        result = self._run([str(output)], capture=not literal)
         if result.returncode != 0 and literal:
             msg = f'Got an error running code "{code}" for language "{repr(self)}" with args {args}.'
             raise RuntimeError(msg)
@@ -236,70 +517,246 @@ class Language:
             errors = parse_errors
         else:
             errors = ()
-        if not is_success and any(i in process.stdout for i in assertion_errors):
+        if not is_success and compile_errors(assertion_errors).search(process.stdout):
             return True
-        if errors and not any(i in process.stdout for i in errors):
+        if errors and not compile_errors(errors).search(process.stdout):
             raise ValueError(f'Got an unexpected response with error "{process.stdout}".')
         return False
 
     # RUST
 
-    @property
+    @functools.cached_property
     def _rustc(self) -> list[str]:
-        return self._get_or_fallbacks(default=['rustc'], envvars=['RUSTC'])
+        # NOTE: rustup proxies every call through a shim, which is slow,
+        # so resolve the real compiler from the toolchain sysroot once.
+        # Any `+toolchain` overrides are handled by the proxy here.
+        # Wrappers, like `sccache rustc`, are left as-is.
+        rustc = self._get_or_fallbacks(default=['rustc'], envvars=['RUSTC'])
+        resolved = which(rustc[0])
+        names = {Path(rustc[0]).stem}
+        if resolved is not None:
+            names.add(Path(os.path.realpath(resolved)).stem)
+        if names.isdisjoint({'rustc', 'rustup'}):
+            return rustc
+        sysroot = self._getoutput([*rustc, '--print', 'sysroot']).strip()
+        path = shutil.which('rustc', path=str(Path(sysroot) / 'bin')) if sysroot else None
+        if path is None:
+            return rustc
+        return [path, *(i for i in rustc[1:] if not i.startswith('+'))]
 
     @property
     def _rust_version(self) -> str:
         output = self._getoutput([*self._rustc, '--version'])
-        return re.match(r'^rustc (\d+\.\d+(?:\.\d+)?)', output).group(1)
+        return rust_version.match(output).group(1)
+
+    def _rust_command(self, output: Path, literal: bool) -> list[str]:
+        '''Get the command to compile our Rust code, read from stdin.'''
+
+        # literals are validated during constant evaluation, so we
+        # only need to type check and can skip codegen and linking.
+        if literal:
+            return [*self._rustc, '--emit=metadata', '-', '-o', str(output.with_suffix('.rmeta'))]
+
+        # share the incremental cache, since the drivers are often identical
+        # between language versions and commands, and only differ slightly
+        # between files. a single codegen unit avoids spawning codegen
+        # threads for these tiny crates, which oversubscribes our jobs.
+        incremental = temp / 'rustc-incremental'
+        return [
+            *self._rustc,
+            '-',
+            '-o',
+            str(output),
+            '-C',
+            f'incremental={incremental}',
+            '-C',
+            'codegen-units=1',
+        ]
 
     def _rust_build(self, code: str, literal: bool) -> tuple[CompletedProcess, bool]:
         '''Run our Rust compilation build and test.'''
 
         def to_cmd(input: Path, output: Path) -> str:
-            return [*self._rustc, str(input), '-o', str(output)]
+            return self._rust_command(output, literal)
 
-        process = self._build_and_test(code, literal, to_cmd)
-        not_equal = self._validate(
+        if literal:
+            path = self.create_path()
+            process = self._run(to_cmd(path, path.with_suffix('')), input=code)
+        else:
+            process = self._build_and_test(code, literal, to_cmd, stdin=True)
+        return (process, self._rust_validate(literal, process))
+
+    def _rust_build_batch(self, codes: list[str], literal: bool) -> list[tuple[CompletedProcess, bool]]:
+        '''
+        Run our Rust compilation build and test for many snippets.
+
+        Each snippet is wrapped in its own module and called from a single
+        driver, which catches panics for each case. Cases which fail to
+        compile are identified from the diagnostic locations and removed,
+        and the remaining cases are recompiled. Literals are only type
+        checked, so the driver is only run for strings.
+        '''
+
+        results: dict[int, CompletedProcess] = {}
+        remaining = list(range(len(codes)))
+        while remaining:
+            # wrap each snippet in a module, tracking the lines it spans
+            modules = []
+            spans = []
+            line = 1
+            for index in remaining:
+                module = f'mod case_{index} {{\n{codes[index]}\n}}\n'
+                lines = module.count('\n')
+                modules.append(module)
+                spans.append((index, line, line + lines - 1))
+                line += lines
+            calls = ', '.join(f'case_{index}::main' for index in remaining)
+            code = self.batch.format(modules=''.join(modules), calls=calls)
+
+            path = self.create_path()
+            output = path.with_suffix('')
+            args = self._rust_command(output, literal)
+            process = self._run(args, input=code)
+            if process.returncode == 0:
+                break
+            if not literal:
+                msg = f'Got an error compiling code "{code}" for language "{repr(self)}" with args {args}.'
+                raise RuntimeError(msg)
+
+            # compile-time failure is a test itself for literals
+            errors = self._rust_batch_errors(process.stdout, spans)
+            if not errors:
+                # cannot attribute the errors to cases, so build them separately
+                separate = self.build_many([codes[i] for i in remaining], literal)
+                results.update(zip(remaining, (process for process, _ in separate)))
+                remaining = []
+                break
+            for index, stdout in errors.items():
+                results[index] = CompletedProcess(args, process.returncode, stdout)
+            remaining = [i for i in remaining if i not in errors]
+
+        # literals have no binary to run, since they're checked at compile time
+        if remaining and literal:
+            for index in remaining:
+                results[index] = CompletedProcess(args, 0, process.stdout)
+        elif remaining:
+            process = self._run([str(output)])
+            # the driver reports the position of each case in the remaining cases
+            for position, (returncode, stdout) in self._rust_batch_cases(process.stdout).items():
+                results[remaining[position]] = CompletedProcess(args, returncode, stdout)
+
+            # if the driver aborted, re-run any missing cases separately
+            missing = [i for i in remaining if i not in results]
+            separate = self.build_many([codes[i] for i in missing], literal)
+            results.update(zip(missing, (process for process, _ in separate)))
+
+        processes = [results[index] for index in range(len(codes))]
+        return [(process, self._rust_validate(literal, process)) for process in processes]
+
+    @staticmethod
+    def _rust_batch_errors(stdout: str, spans: list[tuple[int, int, int]]) -> dict[int, str]:
+        '''Get the compiler errors for each case from the diagnostic output.'''
+
+        # split our diagnostics into blocks, each starting with the level
+        blocks: list[list[str]] = []
+        for line in stdout.splitlines():
+            if rust_diagnostic.match(line) or not blocks:
+                blocks.append([])
+            blocks[-1].append(line)
+
+        errors: dict[int, list[str]] = {}
+        summary: list[str] = []
+        for block in blocks:
+            text = '\n'.join(block)
+            location = rust_location.search(text)
+            if location is None:
+                summary.append(text)
+                continue
+            if not block[0].startswith('error'):
+                continue
+            line = int(location.group(1))
+            for index, start, end in spans:
+                if start <= line <= end:
+                    errors.setdefault(index, []).append(text)
+                    break
+
+        return {k: '\n'.join([*v, *summary]) for k, v in errors.items()}
+
+    @staticmethod
+    def _rust_batch_cases(stdout: str) -> dict[int, tuple[int, str]]:
+        '''Split the output of the batch driver into the status and output of each case.'''
+
+        cases: dict[int, tuple[int, str]] = {}
+        lines: list[str] = []
+        for line in stdout.splitlines():
+            if line.startswith('@@case-begin '):
+                lines = []
+            elif line.startswith('@@case-end '):
+                _, index, returncode = line.split()
+                cases[int(index)] = (int(returncode), '\n'.join(lines))
+            else:
+                lines.append(line)
+
+        return cases
+
+    def _rust_validate(self, literal: bool, process: CompletedProcess) -> bool:
+        '''Validate the completed results from our Rust code.'''
+        return self._validate(
             literal=literal,
             process=process,
             literal_errors=('error:',),
             parse_errors=('`Err`',),
             assertion_errors=('assertion `left == right` failed',),
         )
-        return (process, not_equal)
 
     # PYTHON
 
-    @property
+    @functools.cached_property
     def _python(self) -> list[str]:
-        return self._get_or_fallbacks(
+        # NOTE: version managers like pyenv use shell script shims,
+        # so resolve the real interpreter once.
+        python = self._get_or_fallbacks(
             default=['python'],
             envvars=['PYTHON'],
-            fallbacks=['python', 'python3', 'python2'],
+            fallbacks=['python', 'python3'],
         )
+        executable = self._getoutput([*python, '-c', 'import sys; print(sys.executable)']).strip()
+        if not executable or not Path(executable).exists():
+            return python
+        return [executable, *python[1:]]
 
     @property
     def _python_version(self) -> str:
         output = self._getoutput([*self._python, '--version'])
-        return re.match(r'^Python (\d+\.\d+(?:\.\d+)?)', output).group(1)
+        return python_version.match(output).group(1)
 
     def _python_build(self, code: str, literal: bool) -> tuple[CompletedProcess, bool]:
         '''Interpret our Python code for testing.'''
 
-        process = self._run([*self._python, '-c', code])
-        not_equal = self._validate(
+        process = self._run([*self._python, '-I', '-S', '-c', code])
+        return (process, self._python_validate(literal, process))
+
+    def _python_build_batch(self, codes: list[str], literal: bool) -> list[tuple[CompletedProcess, bool]]:
+        '''Interpret many Python snippets in a long-lived interpreter for testing.'''
+
+        # NOTE: Our snippets only use builtins, so skip `site` and
+        # isolate the interpreter from the user's environment.
+        processes = self._run_worker([*self._python, '-I', '-S', '-u', '-c', self.batch], codes)
+        return [(process, self._python_validate(literal, process)) for process in processes]
+
+    def _python_validate(self, literal: bool, process: CompletedProcess) -> bool:
+        '''Validate the completed results from our Python code.'''
+        return self._validate(
             literal=literal,
             process=process,
             literal_errors=('SyntaxError:', 'NameError:'),
             parse_errors=('ValueError:',),
             assertion_errors=('AssertionError:',),
         )
-        return (process, not_equal)
 
     # JULIA
 
-    @property
+    @functools.cached_property
     def _julia(self) -> list[str]:
         return self._get_or_fallbacks(
             default=['julia'],
@@ -310,7 +767,7 @@ class Language:
     @property
     def _julia_version(self) -> str:
         output = self._getoutput([*self._julia, '--version'])
-        return re.match(r'^.*?(\d+\.\d+(?:\.\d+)?)', output).group(1)
+        return any_version.match(output).group(1)
 
     def _julia_build(self, code: str, literal: bool) -> tuple[CompletedProcess, bool]:
         '''Interpret our Julia code for testing.'''
@@ -327,7 +784,7 @@ class Language:
 
     # RUBY
 
-    @property
+    @functools.cached_property
     def _ruby(self) -> list[str]:
         return self._get_or_fallbacks(
             default=['ruby'],
@@ -338,24 +795,33 @@ class Language:
     @property
     def _ruby_version(self) -> str:
         output = self._getoutput([*self._ruby, '--version'])
-        return re.match(r'^ruby (\d+\.\d+(?:\.\d+)?)', output).group(1)
+        return ruby_version.match(output).group(1)
 
     def _ruby_build(self, code: str, literal: bool) -> tuple[CompletedProcess, bool]:
         '''Interpret our Ruby code for testing.'''
 
         process = self._run([*self._ruby, '-e', code])
-        not_equal = self._validate(
+        return (process, self._ruby_validate(literal, process))
+
+    def _ruby_build_batch(self, codes: list[str], literal: bool) -> list[tuple[CompletedProcess, bool]]:
+        '''Interpret many Ruby snippets in a long-lived interpreter for testing.'''
+
+        processes = self._run_worker([*self._ruby, '-e', self.batch], codes)
+        return [(process, self._ruby_validate(literal, process)) for process in processes]
+
+    def _ruby_validate(self, literal: bool, process: CompletedProcess) -> bool:
+        '''Validate the completed results from our Ruby code.'''
+        return self._validate(
             literal=literal,
             process=process,
             literal_errors=('(SyntaxError)', '(NameError)', '(NoMethodError)'),
             parse_errors=('(ArgumentError)',),
             assertion_errors=('(AssertionError)',),
         )
-        return (process, not_equal)
 
     # C
 
-    @property
+    @functools.cached_property
     def _cc(self) -> list[str]:
         return self._get_or_fallbacks(
             default=['cc'],
@@ -369,30 +835,30 @@ class Language:
         if cc[0] in ('cl', 'cl.exe'):
             raise ValueError('MSVC is currently unsupported.')
         output = self._getoutput([*cc, '--version'])
-        return re.match(r'^.*?(\d+\.\d+(?:\.\d+)?)', output).group(1)
+        return any_version.match(output).group(1)
 
     def _c_build(self, code: str, literal: bool) -> tuple[CompletedProcess, bool]:
         '''Run our C compilation build and test.'''
 
+        # NOTE: The source is read from stdin, so the language must be given.
         def to_cmd(input: Path, output: Path) -> str:
-            cmd = [*self._cc, str(input), '-o', str(output)]
+            cmd = [*self._cc, '-x', 'c', '-', '-o', str(output)]
             if self.langversion:
                 cmd.append(f'-std={self.langversion}')
             return cmd
 
-        process = self._build_and_test(code, literal, to_cmd)
-        not_equal = self._validate(
-            literal=literal,
-            process=process,
-            literal_errors=('error:',),
-            parse_errors=('ParseError:',),
-            assertion_errors=('Assertion `',),
-        )
-        return (process, not_equal)
+        process = self._build_and_test(code, literal, to_cmd, stdin=True)
+        return (process, self._native_validate(literal, process))
+
+    def _c_build_batch(self, codes: list[str], literal: bool) -> list[tuple[CompletedProcess, bool]]:
+        '''Run our C compilation build and test for many snippets.'''
+
+        processes = self._native_build_batch(codes, literal, self._cc)
+        return [(process, self._native_validate(literal, process)) for process in processes]
 
     # C++
 
-    @property
+    @functools.cached_property
     def _cpp(self) -> list[str]:
         return self._get_or_fallbacks(
             default=['c++'],
@@ -406,37 +872,150 @@ class Language:
         if cpp[0] in ('cl', 'cl.exe'):
             raise ValueError('MSVC is currently unsupported.')
         output = self._getoutput([*cpp, '--version'])
-        return re.match(r'^.*?(\d+\.\d+(?:\.\d+)?)', output).group(1)
+        return any_version.match(output).group(1)
 
     def _cpp_build(self, code: str, literal: bool) -> tuple[CompletedProcess, bool]:
         '''Run our C++ compilation build and test.'''
 
+        # NOTE: The source is read from stdin, so the language must be given.
         def to_cmd(input: Path, output: Path) -> str:
-            cmd = [*self._cpp, str(input), '-o', str(output)]
+            cmd = [*self._cpp, '-x', 'c++', '-', '-o', str(output)]
             if self.langversion:
                 cmd.append(f'-std={self.langversion}')
             return cmd
 
-        process = self._build_and_test(code, literal, to_cmd)
-        not_equal = self._validate(
+        process = self._build_and_test(code, literal, to_cmd, stdin=True)
+        return (process, self._native_validate(literal, process))
+
+    def _cpp_build_batch(self, codes: list[str], literal: bool) -> list[tuple[CompletedProcess, bool]]:
+        '''Run our C++ compilation build and test for many snippets.'''
+
+        processes = self._native_build_batch(codes, literal, self._cpp)
+        return [(process, self._native_validate(literal, process)) for process in processes]
+
+    # C AND C++
+
+    def _native_build_batch(
+        self,
+        codes: list[str],
+        literal: bool,
+        compiler: list[str],
+    ) -> list[CompletedProcess]:
+        '''
+        Run our C or C++ compilation build and test for many snippets.
+
+        Each snippet is compiled as its own translation unit, in a single
+        compiler invocation, with `main` renamed so the objects can be
+        linked into a single driver. If `objcopy` is available, all other
+        symbols are made local, so helpers defined by every case don't
+        collide. The driver runs the case given by its argument, so each
+        case is still run in its own process. Cases which fail to link or
+        run are built separately.
+        '''
+
+        directory = temp / f'batch{next(counter)}'
+        directory.mkdir()
+        std = [f'-std={self.langversion}'] if self.langversion else []
+        sources = []
+        for index, code in enumerate(codes):
+            source = f'case_{index}{self.extension}'
+            with (directory / source).open(mode='w', encoding='utf-8') as file:
+                file.write(f'#define main case_{index}\n#line 1\n{code}')
+            sources.append(source)
+
+        # compile-time failure is a test itself for literals
+        # NOTE: Compiler caches only handle a single source file per invocation.
+        wrapper = self._split(os.environ.get('CC_WRAPPER', ''))
+        if wrapper:
+            commands = [[*wrapper, *compiler, '-c', source, *std] for source in sources]
+        else:
+            commands = [[*compiler, '-c', *sources, *std]]
+        processes = self._run_many(commands, cwd=directory)
+        args = commands[0]
+        returncode = next((i.returncode for i in processes if i.returncode != 0), 0)
+        process = CompletedProcess(args, returncode, ''.join(i.stdout for i in processes))
+        results: dict[int, CompletedProcess] = {}
+        compiled = [i for i in range(len(codes)) if (directory / f'case_{i}.o').exists()]
+        failed = [i for i in range(len(codes)) if i not in compiled]
+        if failed and literal:
+            errors = self._native_batch_errors(process.stdout)
+            for index in failed:
+                stdout = errors.get(index, process.stdout)
+                results[index] = CompletedProcess(args, process.returncode or 1, stdout)
+        elif failed:
+            separate = self.build_many([codes[i] for i in failed], literal)
+            results.update(zip(failed, (process for process, _ in separate)))
+
+        # only export the entry point of each case, so they can all be linked.
+        # NOTE: C++ mangles the entry point, so match it by pattern too.
+        objcopy = which('objcopy')
+        if objcopy is not None and compiled:
+            keep = ['--wildcard', '--keep-global-symbol=case_{0}', '--keep-global-symbol=_Z*case_{0}v']
+            commands = [[objcopy, *(j.format(i) for j in keep), f'case_{i}.o'] for i in compiled]
+            self._run_many(commands, cwd=directory)
+
+        # link our driver, building each case separately if it cannot be linked
+        declarations = '\n'.join(f'int case_{i}();' for i in compiled)
+        calls = '\n'.join(f'    case {i}: return case_{i}();' for i in compiled)
+        driver = f'driver{self.extension}'
+        with (directory / driver).open(mode='w', encoding='utf-8') as file:
+            file.write(self.batch.format(declarations=declarations, calls=calls))
+        objects = [f'case_{i}.o' for i in compiled]
+        link = [*compiler, driver, *objects, '-o', 'driver', *std]
+        if compiled and self._run(link, cwd=directory).returncode != 0:
+            separate = self.build_many([codes[i] for i in compiled], literal)
+            results.update(zip(compiled, (process for process, _ in separate)))
+            compiled = []
+
+        # mismatched literals are an error, so re-run them separately to raise it
+        mismatched = []
+        for index in compiled:
+            results[index] = process = self._run([str(directory / 'driver'), str(index)], capture=not literal)
+            if process.returncode != 0 and literal:
+                mismatched.append(index)
+        separate = self.build_many([codes[i] for i in mismatched], literal)
+        results.update(zip(mismatched, (process for process, _ in separate)))
+
+        # NOTE: Remove our objects now, since every batch gets a new directory.
+        # On errors, this is left for the temporary directory cleanup.
+        shutil.rmtree(directory, ignore_errors=True)
+
+        return [results[index] for index in range(len(codes))]
+
+    @staticmethod
+    def _native_batch_errors(stdout: str) -> dict[int, str]:
+        '''Get the compiler errors for each case from the diagnostic output.'''
+
+        errors: dict[int, list[str]] = {}
+        lines: list[str] | None = None
+        for line in stdout.splitlines():
+            location = native_location.search(line)
+            if location is not None:
+                lines = errors.setdefault(int(location.group(1)), [])
+            if lines is not None:
+                lines.append(line)
+
+        return {k: '\n'.join(v) for k, v in errors.items()}
+
+    def _native_validate(self, literal: bool, process: CompletedProcess) -> bool:
+        return self._validate(
             literal=literal,
             process=process,
             literal_errors=('error:',),
             parse_errors=('ParseError:',),
             assertion_errors=('Assertion `',),
         )
-        return (process, not_equal)
 
     # RUST
 
-    @property
+    @functools.cached_property
     def _go(self) -> list[str]:
         return self._get_or_fallbacks(default=['go'], envvars=['GO'])
 
     @property
     def _go_version(self) -> str:
         output = self._getoutput([*self._go, 'version'])
-        return re.match(r'^.*?go(\d+\.\d+(?:\.\d+)?)', output).group(1)
+        return go_version.match(output).group(1)
 
     def _go_build(self, code: str, literal: bool) -> tuple[CompletedProcess, bool]:
         '''Run our Go compilation build and test.'''
@@ -460,7 +1039,7 @@ class Language:
 
     # NODE
 
-    @property
+    @functools.cached_property
     def _node(self) -> list[str]:
         return self._get_or_fallbacks(
             default=['node'],
@@ -471,7 +1050,7 @@ class Language:
     @property
     def _node_version(self) -> str:
         output = self._getoutput([*self._node, '--version'])
-        return re.match(r'^v(\d+\.\d+(?:\.\d+)?)', output).group(1)
+        return node_version.match(output).group(1)
 
     def _node_build(self, code: str, literal: bool) -> tuple[CompletedProcess, bool]:
         '''Interpret our Node.JS code for testing.'''
@@ -497,7 +1076,7 @@ class Language:
         return (process, not_equal)
 
 
-@dataclass
+@dataclass(slots=True)
 class File:
     '''A collection of test cases from a given file.'''
 
@@ -525,8 +1104,8 @@ class File:
             }
         '''
 
-        with path.open(encoding='utf-8') as file:
-            data = tomllib.loads(file.read())
+        with path.open(mode='rb') as file:
+            data = tomllib.load(file)
 
         metadata = Metadata(**data.pop('metadata'))
         floats = [Case(**i) for i in data.pop('floats', [])]
@@ -535,11 +1114,12 @@ class File:
 
         return cls(path=path, metadata=metadata, floats=floats, ints=ints, uints=uints, **data)
 
-    def run(self, command: str | None = None, langversion: str | None = None) -> str:
+    def run(self, command: str | None = None, langversion: str | None = None) -> typing.Iterator[str]:
         '''
         Run the success or failure test cases.
 
-        This returns the data formatted as a markdown table.
+        This yields the data formatted as a markdown table, line-by-line,
+        so the header is available before the test cases are built.
 
         For example:
 
@@ -558,42 +1138,41 @@ class File:
         language = self.get_language(command, langversion)
         version = language.get_version()
         title = self.metadata.title.format(version=version, lang=langversion)
-        result = [f'## \x1b[1;36m{title}\x1b[0m', '']
+        yield f'## \x1b[1;36m{title}\x1b[0m'
+        yield ''
         if self.metadata.description is not None:
-            result += [self.metadata.description, '']
-        result += ['| Flag | Pass | Value | Title |', '|:-:|:-:|:-:|:-:|']
+            yield self.metadata.description
+            yield ''
+        yield '| Flag | Pass | Value | Title |'
+        yield '|:-:|:-:|:-:|:-:|'
+
+        # collect the code for all our test cases, so they can be built at once
+        pending: list[tuple[Case, list[str]]] = []
+        groups = ((self.floats, language.flt), (self.ints, language.int), (self.uints, language.uint))
+        for cases, data_type in groups:
+            # the language has no such type, so these cases don't apply
+            if data_type is None:
+                continue
+            for case in cases:
+                pending.append((case, case.codes(
+                    language=language,
+                    data_type=data_type,
+                    metadata=self.metadata,
+                )))
 
         # run all our test cases
-        for case in self.floats:
-            assert language.flt is not None
-            result.append(case.run(
-                language=language,
-                data_type=language.flt,
-                metadata=self.metadata,
-            ))
-        for case in self.ints:
-            assert language.int is not None
-            result.append(case.run(
-                language=language,
-                data_type=language.int,
-                metadata=self.metadata,
-            ))
-        for case in self.uints:
-            assert language.uint is not None
-            result.append(case.run(
-                language=language,
-                data_type=language.uint,
-                metadata=self.metadata,
-            ))
-
-        return '\n'.join(result)
+        codes = [code for _, case_codes in pending for code in case_codes]
+        results = iter(language.build_batch(codes, self.metadata.literal))
+        for case, case_codes in pending:
+            success = case.evaluate([next(results) for _ in case_codes])
+            yield case.row(success)
 
     def get_language(self, command: str | None = None, langversion: str | None = None) -> Language:
         '''Get the language associated with the format version.'''
         return self.metadata.get_language(command, langversion)
 
 
-@dataclass
+@dataclass(slots=True)
 class Metadata:
     '''Specifies the metadata for the test.'''
 
@@ -622,15 +1201,10 @@ class Metadata:
     def get_language(self, command: str | None = None, langversion: str | None = None) -> Language:
         '''Get the language specification from the name.'''
 
-        language = copy.copy(languages[self.language])
-        if command is not None:
-            language.command = command
-        if langversion is not None:
-            language.langversion = langversion
-        return language
+        return get_language(self.language, command, langversion)
 
 
-@dataclass
+@dataclass(slots=True)
 class Case:
     '''A single test case within the results.'''
 
@@ -657,6 +1231,12 @@ class Case:
         '''Convert the success or failure to a checkmark.'''
         return '✅' if success else '❌'
 
+    def row(self, success: bool) -> str:
+        '''Format the test result as a markdown table row.'''
+        check = self.checkmark(success)
+        value = self.value if isinstance(self.value, str) else self.value[0]
+        return f'| {self.flags} | {check} | {value} | {self.title} |'
+
     def run(self, language: Language, data_type: DataType, metadata: 'Metadata') -> str:
         '''Run a single test case for a given language.'''
 
@@ -665,76 +1245,56 @@ class Case:
             data_type=data_type,
             metadata=metadata,
         )
-        check = self.checkmark(success)
-        value = self.value if isinstance(self.value, str) else self.value[0]
-
-        return f'| {self.flags} | {check} | {value} | {self.title} |'
+        return self.row(success)
 
     def test(self, language: Language, data_type: DataType, metadata: 'Metadata') -> bool:
         '''Test one or more values and return if the test passed.'''
-        fn = self.test_one if isinstance(self.value, str) else self.test_many
-        return fn(
+
+        codes = self.codes(
             language=language,
-            value=self.value,
-            expected=self.expected,
             data_type=data_type,
             metadata=metadata,
         )
-
-    def test_one(
-        self,
-        language: Language,
-        value: str,
-        expected: str,
-        data_type: DataType,
-        metadata: 'Metadata',
-    ) -> bool:
-        '''Run a test case for a single value.'''
-
-        template = language.template(metadata.literal)
-        code = template.format(
-            type=data_type.name,
-            parse=data_type.parse,
-            bits=data_type.bits,
-            value=value,
-            expected=expected,
-            mantissa_radix=metadata.mantissa_radix,
-            exponent_base=metadata.exponent_base,
-            exponent_radix=metadata.exponent_radix,
-        )
-        process, not_equal = language.build(code, metadata.literal)
-        return self.succeeded(process, not_equal)
-
-    def test_many(
-        self,
-        language: Language,
-        value: list[str],
-        expected: list[str],
-        data_type: DataType,
-        metadata: 'Metadata',
-    ) -> bool:
-        '''Run a test case for multiple values.'''
-
-        results = [
-            self.test_one(
-                language=language,
-                value=value[i],
+        return self.evaluate(language.build_batch(codes, metadata.literal))
+
+    def codes(self, language: Language, data_type: DataType, metadata: 'Metadata') -> list[str]:
+        '''Get the code snippets to test for each value.'''
+
+        values = [self.value] if isinstance(self.value, str) else self.value
+        expected = [self.expected] if isinstance(self.expected, str) else self.expected
+        template = compile_template(language.template(metadata.literal))
+        return [
+            template(
+                type=data_type.name,
+                parse=data_type.parse,
+                bits=data_type.bits,
+                value=values[i],
                 expected=expected[i],
-                data_type=data_type,
-                metadata=metadata,
+                mantissa_radix=metadata.mantissa_radix,
+                exponent_base=metadata.exponent_base,
+                exponent_radix=metadata.exponent_radix,
             )
-            for i in range(len(value))
+            for i in range(len(values))
         ]
-        if not all(i == results[0] for i in results[1:]):
-            raise ValueError(f'Got inconsistent results for "{repr(self)}".')
 
-        return results[0]
+    def evaluate(self, results: list[tuple[CompletedProcess, bool]]) -> bool:
+        '''Determine if the test passed from the results of each value.'''
+
+        passed = self.succeeded(*results[0])
+        for process, not_equal in results[1:]:
+            if self.succeeded(process, not_equal) != passed:
+                raise ValueError(f'Got inconsistent results for "{repr(self)}".')
+
+        return passed
 
 
 def main(argv: list[str] | None = None):
     '''Run our main entry point.'''
 
-    global verbose
+    global cache
+    global jobs
+    global subprocesses
+    global temp
 
     parser = argparse.ArgumentParser(
         prog='format validator',
@@ -744,22 +1304,40 @@ def main(argv: list[str] | None = None):
     parser.add_argument('-d', '--directory', nargs='*', help='a directory of files to process')
     parser.add_argument('-o', '--output', help='an optional path to write the data to file')
     parser.add_argument('-c', '--config', help='an optional config file to load')
+    parser.add_argument('--cache', help='an optional directory to cache build results between runs')
+    parser.add_argument('--clean', action='store_true', help='remove any cached build results before running')
+    parser.add_argument(
+        '-j',
+        '--jobs',
+        type=int,
+        default=jobs,
+        help='the number of cases to build in parallel',
+    )
     parser.add_argument('-v', '--verbose', action='store_true', help='log verbose diagnostic output')
     parser.add_argument('-V', '--version', action='version', version=f'%(prog)s {__version__}')
     args = parser.parse_args(argv)
+    if args.clean and args.cache is None:
+        parser.error('--clean requires --cache')
 
     # ensure we print everything to stdout if we're piping the process
-    verbose = args.verbose
+    logging.basicConfig(
+        format='%(message)s',
+        stream=sys.stdout,
+        level=logging.DEBUG if args.verbose else logging.WARNING,
+    )
+    jobs = max(args.jobs, 1)
+    subprocesses = threading.BoundedSemaphore(jobs)
+    if args.cache is not None:
+        cache = Path(args.cache)
+        if args.clean:
+            shutil.rmtree(cache, ignore_errors=True)
+        cache.mkdir(parents=True, exist_ok=True)
 
     # load our config
     config = {'language': {}, 'langversion': {}}
     if args.config is not None:
-        with Path(args.config).open(encoding='utf-8') as file:
-            config = tomllib.loads(file.read())
-
-    # cleanup a previous run, if it exists
-    shutil.rmtree(temp, ignore_errors=True)
-    temp.mkdir(exist_ok=True)
+        with Path(args.config).open(mode='rb') as file:
+            config = tomllib.load(file)
 
     # load all our test files
     files: list[Path] = []
@@ -767,67 +1345,183 @@ def main(argv: list[str] | None = None):
         files += [Path(file) for file in args.file]
     if args.directory is not None:
         for directory in args.directory:
-            files += [file for file in Path(directory).rglob('*.toml')]
+            files += [Path(file) for file in find_files(directory, '.toml')]
 
-    # load all our test cases from these files
-    cases: list['File'] = [File.load(i) for i in files]
+    # load all our test cases from these files, overlapping the file reads
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        cases: list['File'] = list(executor.map(File.load, files))
 
-    # run our test cases and print our results
-    logger = Logger(args.output)
-    logger.log('# \x1b[1;32mResults\x1b[0m')
+    # get every file and language configuration to run
+    runs: list[tuple['File', str | None, str | None]] = []
     for case in cases:
         commands = config['language'].get(case.metadata.language, [None])
         langversions = config['langversion'].get(case.metadata.language, [None])
-        for command, langversion in it.product(commands, langversions):
-            logger.log('\n' + case.run(command=command, langversion=langversion))
-
-
+        runs += [(case, *i) for i in it.product(commands, langversions)]
+
+    # resolve every command up front, so missing tools are reported at once
+    missing = find_missing((case, command) for case, command, _ in runs)
+    if missing:
+        raise RuntimeError(f'Unable to find the commands {", ".join(missing)}.')
+
+    # use a unique directory for our build files, in memory if possible
+    shm = Path('/dev/shm')
+    temp = Path(tempfile.mkdtemp(prefix='format-validator-', dir=shm if shm.is_dir() else None))
+
+    # NOTE: Results are flushed after each file, so don't flush every line.
+    if isinstance(sys.stdout, io.TextIOWrapper):
+        sys.stdout.reconfigure(line_buffering=False)
+
+    # run our test cases and print our results, in order. with a single job,
+    # stream the results as they're available.
+    try:
+        with Logger(args.output) as logger, ThreadPoolExecutor(max_workers=jobs) as executor:
+            logger.log('# \x1b[1;32mResults\x1b[0m')
+            if jobs == 1:
+                results = (case.run(command, langversion) for case, command, langversion in runs)
+            else:
+                futures = [executor.submit(lambda *x: list(x[0].run(*x[1:])), *run) for run in runs]
+                results = (future.result() for future in futures)
+            for result in results:
+                logger.log('')
+                logger.log_iter(result)
+                logger.flush()
+    finally:
+        close_workers()
+        shutil.rmtree(temp, ignore_errors=True)
+
+
+def find_missing(runs: typing.Iterable[tuple['File', str | None]]) -> list[str]:
+    '''Resolve the command for each file and command override, returning any not found.'''
+
+    missing: dict[str, None] = {}
+    seen: set[tuple[str, str | None]] = set()
+    for case, command in runs:
+        if (case.metadata.language, command) in seen:
+            continue
+        seen.add((case.metadata.language, command))
+        language = case.get_language(command)
+        try:
+            resolved = language.get_command()
+        except FileNotFoundError:
+            resolved = None
+        if resolved is None or which(resolved[0]) is None:
+            missing[f'"{command or language.name}"'] = None
+
+    return list(missing)
+
+
+def close_workers() -> None:
+    '''Close all our long-lived interpreters, waiting for them to exit.'''
+
+    with workers_lock:
+        for worker, lock in workers.values():
+            with lock:
+                worker.stdin.close()
+                worker.wait()
+                worker.stdout.close()
+        workers.clear()
+
+
+def find_files(directory: str, extension: str) -> typing.Iterator[str]:
+    '''Recursively find all files with the extension, using the cached directory entry types.'''
+
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                yield from find_files(entry.path, extension)
+            elif entry.name.endswith(extension) and entry.is_file():
+                yield entry.path
+
+
+@functools.cache
+def which(command: str) -> str | None:
+    '''Find the path to a command, caching the lookup since it walks the PATH.'''
+    return shutil.which(command)
+
+
+@functools.cache
+def compile_errors(errors: tuple[str, ...]) -> re.Pattern[str]:
+    '''Compile the error messages to a pattern matching any of them, in a single scan.'''
+    # NOTE: An empty alternation would match anything, so never match.
+    if not errors:
+        return re.compile(r'(?!)')
+    return re.compile('|'.join(map(re.escape, errors)))
+
+
+@functools.cache
+def compile_template(template: str) -> Callable[..., str]:
+    '''Parse a template once, returning a function to format it like `str.format`.'''
+
+    parts: list[tuple[str, str | None]] = []
+    for literal, name, spec, conversion in string.Formatter().parse(template):
+        # NOTE: Only simple fields are precompiled, which is all we use.
+        if name is not None and (spec or conversion or not name.isidentifier()):
+            return template.format
+        parts.append((literal, name))
+
+    def format(**kwds: typing.Any) -> str:
+        items = []
+        for literal, name in parts:
+            items.append(literal)
+            if name is not None:
+                items.append(str(kwds[name]))
+        return ''.join(items)
+
+    return format
+
+
+@functools.cache
 def read_string(path: Path) -> str:
     '''Read a file to string.'''
     with path.open(encoding='utf-8') as file:
         return file.read()
 
 
-languages = {
-    'rust': Language(
+# NOTE: The templates are only read when a language is first used.
+languages: dict[str, Callable[[], Language]] = {
+    'rust': lambda: Language(
         name='rust',
         literal=read_string(lang / 'literal.rs'),
         string=read_string(lang / 'string.rs'),
+        batch=read_string(lang / 'batch.rs'),
         extension='.rs',
         flt=DataType(name='f64', bits=64),
         int=DataType(name='i64', bits=64),
         uint=DataType(name='u64', bits=64),
     ),
-    'python': Language(
+    'python': lambda: Language(
         name='python',
         literal=read_string(lang / 'literal.py'),
         string=read_string(lang / 'string.py'),
+        batch=read_string(lang / 'batch.py'),
         extension='.py',
         flt=DataType(name='float', bits=64),
         int=DataType(name='int', bits=None),
         uint=None,
     ),
-    'c': Language(
+    'c': lambda: Language(
         name='c',
         literal=read_string(lang / 'literal.c'),
         string=read_string(lang / 'string.c'),
         extension='.c',
+        batch=read_string(lang / 'batch.c'),
         # NOTE: This was hacked up with enums but it works anyway.
         flt=DataType(name='f64', bits=64),
         int=DataType(name='i64', bits=64),
         uint=DataType(name='u64', bits=64),
     ),
-    'cpp': Language(
+    'cpp': lambda: Language(
         name='cpp',
         literal=read_string(lang / 'literal.cpp'),
         string=read_string(lang / 'string.cpp'),
         extension='.cpp',
+        batch=read_string(lang / 'batch.cpp'),
         # NOTE: This was hacked up with enums but it works anyway.
         flt=DataType(name='f64', bits=64),
         int=DataType(name='i64', bits=64),
         uint=DataType(name='u64', bits=64),
     ),
-    'julia': Language(
+    'julia': lambda: Language(
         name='julia',
         literal=read_string(lang / 'literal.jl'),
         string=read_string(lang / 'string.jl'),
@@ -836,7 +1530,7 @@ languages = {
         int=DataType(name='Int32', bits=32),
         uint=DataType(name='UInt32', bits=32),
     ),
-    'go': Language(
+    'go': lambda: Language(
         name='go',
         literal=read_string(lang / 'literal.go'),
         string=read_string(lang / 'string.go'),
@@ -845,16 +1539,17 @@ languages = {
         int=DataType(name='int64', bits=64, parse='ParseInt', write='FormatInt'),
         uint=DataType(name='uint64', bits=64, parse='ParseUint', write='FormatUint'),
     ),
-    'ruby': Language(
+    'ruby': lambda: Language(
         name='ruby',
         literal=read_string(lang / 'literal.rb'),
         string=read_string(lang / 'string.rb'),
         extension='.rb',
+        batch=read_string(lang / 'batch.rb'),
         flt=DataType(name='Float', bits=64, parse='parse_float'),
         int=DataType(name='Integer', bits=None, parse='parse_int'),
         uint=None,
     ),
-    'json': Language(
+    'json': lambda: Language(
         name='json',
         literal=None,
         string=read_string(lang / 'json.js'),
@@ -866,5 +1561,25 @@ languages = {
 }
 
 
+@functools.cache
+def get_language(name: str, command: str | None = None, langversion: str | None = None) -> Language:
+    '''Get the language by name and any overrides, creating it on first use.'''
+
+    # NOTE: Share the language for each configuration, so the resolved commands
+    # are cached. Overrides must not copy the cached values from the original.
+    overrides = {}
+    if command is not None:
+        overrides['command'] = command
+    if langversion is not None:
+        overrides['langversion'] = langversion
+    if overrides:
+        return replace(get_language(name), **overrides)
+
+    factory = languages.get(name)
+    if factory is None:
+        raise ValueError(f'Got an unsupported language of "{name}".')
+    return factory()
+
+
 if __name__ == '__main__':
     main()
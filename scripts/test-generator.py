@@ -39,10 +39,13 @@
 import typing
 import argparse
 import enum
+import functools
+import io
 import math
 import os
 import re
-from dataclasses import dataclass
+import sys
+from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
 
@@ -50,6 +53,13 @@ __version__ = '0.0.1'
 __author__ = 'Alex Huszagh <ahuszagh@gmail.com>'
 
 home = Path(__file__).absolute().parent.parent
+ansi_escape = re.compile(r'\x1b\[[0-9;]*m')
+bare_key = re.compile(r'[A-Za-z0-9_-]+')
+# strings with no escapes, quotes, or line boundaries for `str.splitlines`
+plain_string = re.compile(r'[^\\\b\f"\n\r\v\x1c-\x1e\x85\u2028\u2029]*')
+radix_digits = b'0123456789abcdefghijklmnopqrstuvwxyz'
+multi_escapes = str.maketrans({'\\': '\\\\', '\b': '\\b', '\f': '\\f'})
+single_escapes = str.maketrans({'\\': '\\\\', '\b': '\\b', '\f': '\\f', '\n': '\\n', '\r': '\\r'})
 
 _bool: typing.TypeAlias = bool
 _int: typing.TypeAlias = int
@@ -66,17 +76,25 @@ class Ansi:
     '''ANSI enum color codes.'''
 
     RESET: typing.ClassVar[str] = '\x1b[0m'
+    # if to color the output, otherwise, no escape sequences are written
+    enabled: typing.ClassVar[bool] = True
 
     @staticmethod
     def key(value: str) -> str:
+        if not Ansi.enabled:
+            return value
         return f'\x1b[3;36m{value}\x1b[23;39m'
 
     @staticmethod
     def bool(value: str) -> str:
+        if not Ansi.enabled:
+            return value
         return f'\x1b[38;5;27m{value}\x1b[39m'
 
     @staticmethod
     def number(value: str) -> str:
+        if not Ansi.enabled:
+            return value
         return f'\x1b[38;5;82m{value}\x1b[39m'
 
     @staticmethod
@@ -85,10 +103,14 @@ class Ansi:
 
     @staticmethod
     def string(value: str) -> str:
+        if not Ansi.enabled:
+            return value
         return f'\x1b[38;5;172m{value}\x1b[39m'
 
     @staticmethod
     def header(value: str) -> str:
+        if not Ansi.enabled:
+            return f'[{value}]'
         inner = f'\x1b[3;32m{value}\x1b[23;32m'
         start = '\x1b[1;35m'
         end = '\x1b[22;39m'
@@ -96,33 +118,56 @@ class Ansi:
 
     @staticmethod
     def array(value: str) -> str:
+        if not Ansi.enabled:
+            return f'[{Ansi.header(value)}]'
         start = '\x1b[1;33m'
         end = '\x1b[22;39m'
         return f'{start}[{end}{Ansi.header(value)}{start}]{end}'
 
     @staticmethod
     def comment(value: str) -> str:
+        if not Ansi.enabled:
+            return value
         return f'\x1b[2m{value}\x1b[22m'
 
 
-@dataclass
+@dataclass(slots=True)
 class Logger:
     '''Custom logger that also logs to an output file.'''
 
     output: os.PathLike | None
     quiet: bool
+    # the output file, kept open for all our messages
+    file: typing.TextIO | None = field(default=None, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        '''Open our output file, if provided.'''
+        if self.output is not None:
+            self.file = open(self.output, mode='a+', encoding='utf-8', buffering=65536)
 
     def log(self, message: str) -> None:
         '''Log our data to stdout, and optionally to file with no escape sequences.'''
 
         if not self.quiet:
-            print(message)
-        if self.output is None:
+            sys.stdout.write(f'{message}\n')
+        if self.file is None:
             return
 
-        with open(self.output, mode='a+', encoding='utf-8') as file:
-            no_ansi = re.sub(r'\x1b\[[0-9;]*m', '', message)
-            print(no_ansi, file=file)
+        no_ansi = ansi_escape.sub('', message) if '\x1b' in message else message
+        self.file.write(f'{no_ansi}\n')
+
+    def close(self) -> None:
+        '''Close the output file, flushing any buffered messages.'''
+        sys.stdout.flush()
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def __enter__(self) -> 'Logger':
+        return self
+
+    def __exit__(self, *args: typing.Any) -> None:
+        self.close()
 
 
 class Line(enum.Enum):
@@ -136,28 +181,25 @@ class TomlFormat:
 
     @staticmethod
     def key(key: _str) -> _str:
+        # NOTE: The colors can change at runtime, so they aren't cached.
+        return Ansi.key(TomlFormat._key(key))
+
+    @staticmethod
+    @functools.cache
+    def _key(key: _str) -> _str:
         # NOTE: Keys can be empty but must be quotes
-        use_bare = re.match(r'^[A-Za-z0-9_-]+$', key) is not None
-        key = key if use_bare else TomlFormat.string(key, Line.SINGLE)
-        return Ansi.key(key)
+        use_bare = bare_key.fullmatch(key) is not None
+        return key if use_bare else TomlFormat.string(key, Line.SINGLE)
 
     @staticmethod
     def value(value: _value, multiline: Line = Line.GUESS, indent: int = 0) -> _str:
         # NOTE: Tables will always be single-line, arrays and strings can be multi
-        if isinstance(value, _bool):
-            return Ansi.bool(TomlFormat.bool(value))
-        elif isinstance(value, _int):
-            return Ansi.number(TomlFormat.int(value))
-        elif isinstance(value, _float):
-            return Ansi.number(TomlFormat.float(value))
-        elif isinstance(value, _str):
-            return Ansi.string(TomlFormat.string(value, multiline))
-        elif isinstance(value, _datetime):
-            return Ansi.datetime(TomlFormat.datetime(value))
-        elif isinstance(value, list):
-            return TomlFormat.array(value, multiline, indent)
-        elif isinstance(value, dict):
-            return TomlFormat.table(value, Line.SINGLE)
+        formatter = value_formatters.get(type(value))
+        if formatter is None:
+            # subclasses, like `bool` for `int`, are checked in order
+            formatter = next((v for k, v in value_formatters.items() if isinstance(value, k)), None)
+        if formatter is not None:
+            return formatter(value, multiline, indent)
         cls_name = value.__class__.__name__
         raise TypeError(f'Got an invalid value type of "{cls_name}".')
 
@@ -180,16 +222,14 @@ class TomlFormat:
     @staticmethod
     def _escape(value: _str, multiline: Line = Line.GUESS) -> _str:
         # NOTE: Don't skip tabs, and quotes which we handle above
-        value = value.replace('\\', '\\\\')
-        value = value.replace('\b', '\\b')
-        value = value.replace('\f', '\\f')
-        if multiline != Line.MULTI:
-            value = value.replace('\n', '\\n')
-            value = value.replace('\r', '\\r')
-        return value
+        table = multi_escapes if multiline == Line.MULTI else single_escapes
+        return value.translate(table)
 
     @staticmethod
     def string(value: _str, multiline: Line = Line.GUESS) -> _str:
+        # NOTE: Most strings are short and need no escapes or line breaks.
+        if multiline != Line.MULTI and plain_string.fullmatch(value) is not None:
+            return f'"{value}"'
         lines = len(value.splitlines())
         if multiline == Line.MULTI:
             # NOTE: The first newline is trimmed in raw strings.
@@ -227,8 +267,14 @@ class TomlFormat:
         # NOTE: This does not support the `[[key]]` table format
         data = [TomlFormat.value(i, multiline, indent=indent + 2) for i in value]
         if multiline == Line.GUESS:
-            length = sum(len(i) for i in data) + 2 * len(data)
-            multiline = Line.SINGLE if length <= 80 else Line.MULTI
+            # NOTE: Only count the visible width, not the color codes.
+            multiline = Line.SINGLE
+            length = 0
+            for item in data:
+                length += len(ansi_escape.sub('', item)) + 2
+                if length > 80 or '\n' in item:
+                    multiline = Line.MULTI
+                    break
 
         if multiline == Line.MULTI:
             space = ' ' * (indent + 2)
@@ -253,33 +299,65 @@ class TomlFormat:
         return '\n'.join(data)
 
 
+# the formatters for each value type, in the order subclasses are checked.
+value_formatters: dict[type, typing.Callable[[typing.Any, Line, int], _str]] = {
+    _bool: lambda value, multiline, indent: Ansi.bool(TomlFormat.bool(value)),
+    _int: lambda value, multiline, indent: Ansi.number(TomlFormat.int(value)),
+    _float: lambda value, multiline, indent: Ansi.number(TomlFormat.float(value)),
+    _str: lambda value, multiline, indent: Ansi.string(TomlFormat.string(value, multiline)),
+    _datetime: lambda value, multiline, indent: Ansi.datetime(TomlFormat.datetime(value)),
+    list: lambda value, multiline, indent: TomlFormat.array(value, multiline, indent),
+    dict: lambda value, multiline, indent: TomlFormat.table(value, Line.SINGLE),
+}
+
+
 def base_repr(n, base: int = 10):
     '''Convert a number to string with a given radix.'''
 
+    # NOTE: `str` is implemented in C, and is much faster for decimal.
+    if base == 10:
+        return str(n)
     if n < 0:
         return '-' + base_repr(-n, base)
 
-    digits = []
+    digits = bytearray()
     while n >= base:
-        digits.append(str(n % base))
-        n //= base
-    digits.append(str(n % base))
+        n, digit = divmod(n, base)
+        digits.append(radix_digits[digit])
+    digits.append(radix_digits[n])
+    digits.reverse()
 
-    return ''.join(digits[::-1])
+    return digits.decode('ascii')
+
+
+def decimal_fraction(numerator: int, denominator: int) -> str:
+    '''Get the decimal digits after the point for a fraction less than 1.'''
+
+    # NOTE: The fraction only terminates in decimal if the denominator
+    # has no factors other than 2 and 5, otherwise, round through a float.
+    twos = (denominator & -denominator).bit_length() - 1
+    rest = denominator >> twos
+    fives = 0
+    while rest % 5 == 0:
+        rest //= 5
+        fives += 1
+    if rest != 1:
+        return str(numerator / denominator)[2:]
+
+    scale = max(twos, fives)
+    digits = str(numerator * 10**scale // denominator).zfill(scale)
+    return digits.rstrip('0') or '0'
 
 
 def swap_case(s: str) -> str:
     code = ord(s)
     if code > 127:
         raise ValueError('Exponent character must be in the ASCII plane.')
-    if 0x61 <= code <= 0x7a:
-        return chr(code - 0x20)
-    elif 0x41 <= code <= 0x5a:
-        return chr(code + 0x20)
-    return s
+    # NOTE: Only ASCII letters have a swapped case here, so the builtin is exact.
+    return s.swapcase()
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Case:
     '''A single test case metadata.'''
 
@@ -289,512 +367,512 @@ class Case:
     outcome: str
 
 
-cases: dict[int, Case] = {
-    0: Case(
+cases: tuple[Case, ...] = (
+    Case(
         index=0,
         title='Simple',
         flags='',
         outcome='pass',
     ),
-    1: Case(
+    Case(
         index=1,
         title='Required integer digits.',
         flags='I/R',
         outcome='fail',
     ),
-    2: Case(
+    Case(
         index=2,
         title='Required fraction digits.',
         flags='F/R',
         outcome='fail',
     ),
-    3: Case(
+    Case(
         index=3,
         title='Required exponent digits.',
         flags='E/R',
         outcome='fail',
     ),
-    4: Case(
+    Case(
         index=4,
         title='Required mantissa digits.',
         flags='M/R',
         outcome='fail',
     ),
-    5: Case(
+    Case(
         index=5,
         title='No mantissa positive sign.',
         flags='+/M',
         outcome='fail',
     ),
-    6: Case(
+    Case(
         index=6,
         title='Required positive sign.',
         flags='R/M',
         outcome='fail',
     ),
-    7: Case(
+    Case(
         index=7,
         title='No exponent notation.',
         flags='e/e',
         outcome='fail',
     ),
-    8: Case(
+    Case(
         index=8,
         title='No exponent positive sign.',
         flags='+/E',
         outcome='fail',
     ),
-    9: Case(
+    Case(
         index=9,
         title='Required exponent sign.',
         flags='R/E',
         outcome='fail',
     ),
-    10: Case(
+    Case(
         index=10,
         title='No exponent without fraction.',
         flags='e/F',
         outcome='fail',
     ),
-    11: Case(
+    Case(
         index=11,
         title='Require integer digits with exponent.',
         flags='I/E',
         outcome='fail',
     ),
-    12: Case(
+    Case(
         index=12,
         title='Require fraction digits with exponent.',
         flags='F/E',
         outcome='fail',
     ),
-    13: Case(
+    Case(
         index=13,
         title='Require mantissa digits with exponent.',
         flags='M/E',
         outcome='fail',
     ),
-    14: Case(
+    Case(
         index=14,
         title='No integer leading zeros.',
         flags='N/I',
         outcome='assert',
     ),
-    15: Case(
+    Case(
         index=15,
         title='No float leading zeros.',
         flags='N/F',
         outcome='assert',
     ),
-    16: Case(
+    Case(
         index=16,
         title='Required exponent notation.',
         flags='R/e',
         outcome='fail',
     ),
-    17: Case(
+    Case(
         index=17,
         title='Case-sensitive exponent character.',
         flags='e/C',
         outcome='fail',
     ),
-    18: Case(
+    Case(
         index=18,
         title='Integer internal digit separator.',
         flags='I/I',
         outcome='pass',
     ),
-    19: Case(
+    Case(
         index=19,
         title='Mantissa internal digit separator.',
         flags='M/I',
         outcome='pass',
     ),
-    20: Case(
+    Case(
         index=20,
         title='Fraction internal digit separator.',
         flags='F/I',
         outcome='pass',
     ),
-    21: Case(
+    Case(
         index=21,
         title='Exponent internal digit separator.',
         flags='E/I',
         outcome='pass',
     ),
-    22: Case(
+    Case(
         index=22,
         title='Integer leading digit separator.',
         flags='I/L',
         outcome='pass',
     ),
-    23: Case(
+    Case(
         index=23,
         title='Mantissa leading digit separator.',
         flags='M/L',
         outcome='pass',
     ),
-    24: Case(
+    Case(
         index=24,
         title='Fraction leading digit separator.',
         flags='F/L',
         outcome='pass',
     ),
-    25: Case(
+    Case(
         index=25,
         title='Exponent leading digit separator.',
         flags='E/L',
         outcome='pass',
     ),
-    26: Case(
+    Case(
         index=26,
         title='Integer trailing digit separator.',
         flags='I/T',
         outcome='pass',
     ),
-    27: Case(
+    Case(
         index=27,
         title='Mantissa trailing digit separator.',
         flags='M/T',
         outcome='pass',
     ),
-    28: Case(
+    Case(
         index=28,
         title='Fraction trailing digit separator.',
         flags='F/T',
         outcome='pass',
     ),
-    29: Case(
+    Case(
         index=29,
         title='Exponent trailing digit separator.',
         flags='E/T',
         outcome='pass',
     ),
-    30: Case(
+    Case(
         index=30,
         title='Integer consecutive digit separator.',
         flags='I/C',
         outcome='pass',
     ),
-    31: Case(
+    Case(
         index=31,
         title='Mantissa consecutive digit separator.',
         flags='M/C',
         outcome='pass',
     ),
-    32: Case(
+    Case(
         index=32,
         title='Fraction consecutive digit separator.',
         flags='F/C',
         outcome='pass',
     ),
-    33: Case(
+    Case(
         index=33,
         title='Exponent consecutive digit separator.',
         flags='E/C',
         outcome='pass',
     ),
-    34: Case(
+    Case(
         index=34,
         title='Digit separator with empty integer.',
         flags='_/I',
         outcome='pass',
     ),
-    35: Case(
+    Case(
         index=35,
         title='Consecutive digit separator with empty integer.',
         flags='\'/I',
         outcome='pass',
     ),
-    36: Case(
+    Case(
         index=36,
         title='Digit separator with empty fraction.',
         flags='_/F',
         outcome='pass',
     ),
-    37: Case(
+    Case(
         index=37,
         title='Consecutive digit separator with empty fraction.',
         flags='\'/F',
         outcome='pass',
     ),
-    38: Case(
+    Case(
         index=38,
         title='Digit separator with empty mantissa.',
         flags='_/M',
         outcome='pass',
     ),
-    39: Case(
+    Case(
         index=39,
         title='Consecutive digit separator with empty mantissa.',
         flags='\'/M',
         outcome='pass',
     ),
-    40: Case(
+    Case(
         index=40,
         title='Digit separator with empty exponent.',
         flags='_/E',
         outcome='pass',
     ),
-    41: Case(
+    Case(
         index=41,
         title='Consecutive digit separator with empty exponent.',
         flags='\'/E',
         outcome='pass',
     ),
-    42: Case(
+    Case(
         index=42,
         title='No special (non-finite) values.',
         flags='S/S',
         outcome='fail',
     ),
-    43: Case(
+    Case(
         index=43,
         title='Case-sensitive special (non-finite) values.',
         flags='S/c',
         outcome='fail',
     ),
-    44: Case(
+    Case(
         index=44,
         title='Special (non-finite) digit separator.',
         flags='S/_',
         outcome='pass',
     ),
-    45: Case(
+    Case(
         index=45,
         title='Consecutive special digit separator.',
         flags='S/C',
         outcome='pass',
     ),
-    46: Case(
+    Case(
         index=46,
         title='Has a representation of NaN.',
         flags='h/N',
         outcome='pass',
     ),
-    47: Case(
+    Case(
         index=47,
         title='Allows a positive sign before a representation of NaN.',
         flags='+/N',
         outcome='pass',
     ),
-    48: Case(
+    Case(
         index=48,
         title='Allows a negative sign before a representation of NaN.',
         flags='-/N',
         outcome='pass',
     ),
-    49: Case(
+    Case(
         index=49,
         title='Has a case-sensitive representation of NaN.',
         flags='c/N',
         outcome='fail',
     ),
-    50: Case(
+    Case(
         index=50,
         title='Has a representation of short infinity.',
         flags='h/S',
         outcome='pass',
     ),
-    51: Case(
+    Case(
         index=51,
         title='Allows a positive sign before a representation of short infinity.',
         flags='+/S',
         outcome='pass',
     ),
-    52: Case(
+    Case(
         index=52,
         title='Allows a negative sign before a representation of short infinity.',
         flags='-/S',
         outcome='pass',
     ),
-    53: Case(
+    Case(
         index=53,
         title='Has a case-sensitive representation of short infinity.',
         flags='c/S',
         outcome='fail',
     ),
-    54: Case(
+    Case(
         index=54,
         title='Has a representation of long infinity.',
         flags='h/L',
         outcome='pass',
     ),
-    55: Case(
+    Case(
         index=55,
         title='Allows a positive sign before a representation of long infinity.',
         flags='+/L',
         outcome='pass',
     ),
-    56: Case(
+    Case(
         index=56,
         title='Allows a negative sign before a representation of long infinity.',
         flags='-/L',
         outcome='pass',
     ),
-    57: Case(
+    Case(
         index=57,
         title='Has a case-sensitive representation of long infinity.',
         flags='c/L',
         outcome='fail',
     ),
-    58: Case(
+    Case(
         index=58,
         title='Supports base prefixes.',
         flags='s/P',
         outcome='pass',
     ),
-    59: Case(
+    Case(
         index=59,
         title='Does not support base prefixes.',
         flags='n/P',
         outcome='fail',
     ),
-    60: Case(
+    Case(
         index=60,
         title='Case-sensitive base prefix.',
         flags='e/P',
         outcome='fail',
     ),
-    61: Case(
+    Case(
         index=61,
         title='Require base prefixes.',
         flags='r/P',
         outcome='fail',
     ),
-    62: Case(
+    Case(
         index=62,
         title='Supports base suffixes.',
         flags='s/S',
         outcome='pass',
     ),
-    63: Case(
+    Case(
         index=63,
         title='Does not support base suffixes.',
         flags='n/S',
         outcome='fail',
     ),
-    64: Case(
+    Case(
         index=64,
         title='Case-sensitive base suffix.',
         flags='e/S',
         outcome='fail',
     ),
-    65: Case(
+    Case(
         index=65,
         title='Require base suffixes.',
         flags='r/S',
         outcome='fail',
     ),
-    66: Case(
+    Case(
         index=66,
         title='Base prefix internal digit separators.',
         flags='P/I',
         outcome='pass',
     ),
-    67: Case(
+    Case(
         index=67,
         title='Base prefix leading digit separators.',
         flags='P/L',
         outcome='pass',
     ),
-    68: Case(
+    Case(
         index=68,
         title='Base prefix trailing digit separators.',
         flags='P/T',
         outcome='pass',
     ),
-    69: Case(
+    Case(
         index=69,
         title='Base prefix consecutive digit separators.',
         flags='P/C',
         outcome='pass',
     ),
-    70: Case(
+    Case(
         index=70,
         title='Base suffix internal digit separators.',
         flags='S/I',
         outcome='pass',
     ),
-    71: Case(
+    Case(
         index=71,
         title='Base suffix leading digit separators.',
         flags='S/L',
         outcome='pass',
     ),
-    72: Case(
+    Case(
         index=72,
         title='Base suffix trailing digit separators.',
         flags='S/T',
         outcome='pass',
     ),
-    73: Case(
+    Case(
         index=73,
         title='Base suffix consecutive digit separators.',
         flags='S/C',
         outcome='pass',
     ),
-    74: Case(
+    Case(
         index=74,
         title='No unsigned integer negative sign.',
         flags='-/U',
         outcome='fail',
     ),
-    75: Case(
+    Case(
         index=75,
         title='No mantissa positive or negative sign.',
         flags='-/M',
         outcome='fail',
     ),
-    76: Case(
+    Case(
         index=76,
         title='No exponent positive or negative sign.',
         flags='-/E',
         outcome='fail',
     ),
-    77: Case(
+    Case(
         index=77,
         title='Absolute start digit separator.',
         flags='s/D',
         outcome='pass',
     ),
-    78: Case(
+    Case(
         index=78,
         title='Integer sign digit separator.',
         flags='I/s',
         outcome='pass',
     ),
-    79: Case(
+    Case(
         index=79,
         title='Integer sign consecutive digit separator.',
         flags='I/c',
         outcome='pass',
     ),
-    80: Case(
+    Case(
         index=80,
         title='Mantissa sign digit separator.',
         flags='M/s',
         outcome='pass',
     ),
-    81: Case(
+    Case(
         index=81,
         title='Mantissa sign consecutive digit separator.',
         flags='M/c',
         outcome='pass',
     ),
-    82: Case(
+    Case(
         index=82,
         title='Exponent sign digit separator.',
         flags='E/s',
         outcome='pass',
     ),
-    83: Case(
+    Case(
         index=83,
         title='Exponent sign consecutive digit separator.',
         flags='E/c',
         outcome='pass',
     ),
-}
+)
 
 
 class Sign(enum.Enum):
@@ -804,22 +882,25 @@ class Sign(enum.Enum):
     REQUIRED = enum.auto()
 
     def sign(self, is_negative: bool) -> str:
-        match self:
-            case Sign.NONE:
-                if is_negative:
-                    raise ValueError('Cannot have negative value with no signs.')
-                return ''
-            case Sign.OPTIONAL:
-                return '-' if is_negative else ''
-            case Sign.NO_POSITIVE:
-                return '-' if is_negative else ''
-            case Sign.REQUIRED:
-                return '-' if is_negative else '+'
-            case _:
-                raise NotImplementedError('Unreachable')
-
-
-@dataclass
+        sign = signs.get((self, is_negative))
+        if sign is None:
+            raise ValueError('Cannot have negative value with no signs.')
+        return sign
+
+
+# the sign characters for each sign type and if the value is negative
+signs: dict[tuple[Sign, bool], str] = {
+    (Sign.NONE, False): '',
+    (Sign.OPTIONAL, False): '',
+    (Sign.OPTIONAL, True): '-',
+    (Sign.NO_POSITIVE, False): '',
+    (Sign.NO_POSITIVE, True): '-',
+    (Sign.REQUIRED, False): '+',
+    (Sign.REQUIRED, True): '-',
+}
+
+
+@dataclass(slots=True)
 class Generator:
     '''A test-case generator'''
 
@@ -853,6 +934,9 @@ class Generator:
     no_floats: bool = False
     no_ints: bool = False
     no_uints: bool = False
+    # the formatted base prefix and suffix, used in every case
+    prefix: str = field(default='', init=False, repr=False)
+    suffix: str = field(default='', init=False, repr=False)
 
     def __post_init__(self) -> None:
         if self.exponent_base < 0:
@@ -865,12 +949,14 @@ class Generator:
             assert ord(self.base_prefix) < 128
         if self.base_suffix is not None:
             assert ord(self.base_suffix) < 128
+        self.prefix = f'0{self.base_prefix}' if self.base_prefix else ''
+        self.suffix = self.base_suffix or ''
 
     def get_base_prefix(self) -> str:
-        return f'0{self.base_prefix}' if self.base_prefix else ''
+        return self.prefix
 
     def get_base_suffix(self) -> str:
-        return self.base_suffix or ''
+        return self.suffix
 
     @property
     def metadata(self) -> _table:
@@ -904,8 +990,7 @@ class Generator:
 
     def print_case(self, header: str, actual: _strs, expected: _strs, index: int) -> str:
         case = self.case(actual=actual, expected=expected, index=index)
-        self.logger.log(f'{self.array_header(header, index)}')
-        self.logger.log(TomlFormat.table(case, Line.MULTI) + '\n')
+        self.logger.log(f'{self.array_header(header, index)}\n{TomlFormat.table(case, Line.MULTI)}\n')
 
     @staticmethod
     def array_header(header: str, index: int) -> str:
@@ -929,6 +1014,8 @@ class Generator:
         sign = self.mantissa_sign.sign(is_negative) if sign is None else sign
         prefix = self.get_base_prefix() if prefix is None else prefix
         suffix = self.get_base_suffix() if suffix is None else suffix
+        if not sign and not prefix and not suffix:
+            return value
         return f'{sign}{prefix}{value}{suffix}'
 
     def to_int_actual(
@@ -968,15 +1055,10 @@ class Generator:
         elif scaled > 10:
             digits -= 1
 
-        # NOTE: Normally 17 digits is normally the amount required to
-        # get an exact representation, unique in every case, and we
-        # just hack it up here but since we're in a controlled environment
-        # we don't need to worry about real corner cases.
-        start_digits = digits
-        scaled = value * (10 ** digits)
-        while digits - start_digits < 17 and round(scaled) != scaled:
-            digits += 1
-            scaled = value * (10 ** digits)
+        # NOTE: Normally up to 17 digits are required to get an exact,
+        # unique representation, however, the value is an integer, so
+        # scaling it by a power of 10 is always exact and no more digits
+        # are ever required.
         return digits
 
     def to_decimal(
@@ -1012,13 +1094,13 @@ class Generator:
 
         # convert the decimal components over
         mantissa_sign = mantissa_sign or self.mantissa_sign.sign(is_negative)
-        as_decimal = str(fraction / denominator)[2:]
-        value = f'{mantissa_sign}{integer}{self.decimal_point}{as_decimal}'
-        if exponent is not None:
-            exponent_sign = exponent_sign or self.exponent_sign.sign(is_negative)
-            value += f'{self.exponent_char}{exponent_sign}{exponent}'
+        as_decimal = decimal_fraction(fraction, denominator)
+        mantissa = f'{mantissa_sign}{integer}{self.decimal_point}{as_decimal}'
+        if exponent is None:
+            return mantissa
 
-        return value
+        exponent_sign = exponent_sign or self.exponent_sign.sign(is_negative)
+        return f'{mantissa}{self.exponent_char}{exponent_sign}{exponent}'
 
     def print_simple(self) -> None:
         '''Write our simple test cases.'''
@@ -1225,11 +1307,12 @@ class Generator:
         sep = self.digit_separator
         if sep is None:
             return
+        # leading separators are tested with a negative sign, if possible
+        has_prefix = self.base_prefix is not None
+        use_neg = not has_prefix and self.mantissa_sign != Sign.NONE
         if not self.no_ints:
             pos = self.to_int_expected(radix + 1)
             neg = self.to_int_expected(-radix - 1, sign=Sign.OPTIONAL)
-            has_prefix = self.base_prefix is not None
-            use_neg = not has_prefix and self.mantissa_sign != Sign.NONE
             self.print_case(
                 header='ints',
                 actual=self.to_actual(f'1{sep}1'),
@@ -1296,8 +1379,6 @@ class Generator:
                 exponent=radix + 1,
                 digits=2,
             )
-            has_prefix = self.base_prefix is not None
-            use_neg = not has_prefix and self.mantissa_sign != Sign.NONE
             self.print_case(
                 header='floats',
                 actual=self.to_actual(f'1{sep}1{dot}11'),
@@ -1552,8 +1633,8 @@ class Generator:
             return [s[:i] + swap_case(s[i]) + s[i + 1:] for i in range(n)]
 
         def sep_permutations(s: str, n: int, c: int = 1) -> list[str]:
-            sep = self.digit_separator
-            return [s[:i] + sep * c + s[i:] for i in range(1, n + 1)]
+            sep = self.digit_separator * c
+            return [s[:i] + sep + s[i:] for i in range(1, n + 1)]
 
         # NOTE: all specials do not support base prefixes/suffixes, etc.
         if self.no_floats:
@@ -1969,38 +2050,43 @@ def main(argv: list[str] | None = None):
     )
 
     args = parser.parse_args(argv)
+    # NOTE: The file output never has colors, so only add them if shown.
+    Ansi.enabled = not args.quiet and sys.stdout.isatty()
+    # NOTE: The output is flushed when the logger is closed, so don't flush every line.
+    if isinstance(sys.stdout, io.TextIOWrapper):
+        sys.stdout.reconfigure(line_buffering=False)
     match args.subcommand:
         case 'config':
             raise NotImplementedError('TODO')
         case 'language':
             if args.output is not None:
                 Path(args.output).unlink(missing_ok=True)
-            logger = Logger(args.output, args.quiet)
-            generator = Generator(
-                logger=logger,
-                title=args.title,
-                literal=args.literal,
-                language=args.language,
-                base_prefix=args.base_prefix,
-                base_suffix=args.base_suffix,
-                description=args.description,
-                mantissa_radix=args.mantissa_radix,
-                exponent_base=args.exponent_base,
-                exponent_radix=args.exponent_radix,
-                decimal_point=args.decimal_point,
-                exponent_char=args.exponent_char,
-                nan_string=args.nan_string,
-                nan_expr=args.nan_expr,
-                inf_string=args.inf_string,
-                inf_expr=args.inf_expr,
-                infinity_string=args.infinity_string,
-                infinity_expr=args.infinity_expr,
-                no_exponent=args.no_exponent,
-                no_floats=args.no_floats,
-                no_ints=args.no_ints,
-                no_uints=args.no_uints,
-            )
-            generator.print()
+            with Logger(args.output, args.quiet) as logger:
+                generator = Generator(
+                    logger=logger,
+                    title=args.title,
+                    literal=args.literal,
+                    language=args.language,
+                    base_prefix=args.base_prefix,
+                    base_suffix=args.base_suffix,
+                    description=args.description,
+                    mantissa_radix=args.mantissa_radix,
+                    exponent_base=args.exponent_base,
+                    exponent_radix=args.exponent_radix,
+                    decimal_point=args.decimal_point,
+                    exponent_char=args.exponent_char,
+                    nan_string=args.nan_string,
+                    nan_expr=args.nan_expr,
+                    inf_string=args.inf_string,
+                    inf_expr=args.inf_expr,
+                    infinity_string=args.infinity_string,
+                    infinity_expr=args.infinity_expr,
+                    no_exponent=args.no_exponent,
+                    no_floats=args.no_floats,
+                    no_ints=args.no_ints,
+                    no_uints=args.no_uints,
+                )
+                generator.print()
 
 
 if __name__ == '__main__':